@@ -9,22 +9,68 @@
 Версия: 1.0
 """
 
+import functools
+import itertools
 import json
+import logging
 import os
-from typing import List, Dict, Any, Optional
+import time
+from collections import Counter, defaultdict
+from typing import List, Dict, Any, Iterator, Optional, Sequence, Set, Tuple
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:  # orjson е незадължителна - резервно се използва json
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # ijson е незадължителна - файлът се чете наведнъж
+    ijson = None
+
 # ============================================================================
 # КОНФИГУРАЦИЯ И КОНСТАНТИ
 # ============================================================================
 
+# Логър на модула - съобщенията за отделните заявки са на ниво DEBUG,
+# за да не натоварват често извикваните функции за търсене
+logger = logging.getLogger(__name__)
+
 # Път до файла с данни за екопътеките
 DATA_FILE_PATH = os.path.join(os.path.dirname(__file__), 'data', 'eco.json')
 
-# Кеш за данните за подобряване на производителността
-_data_cache = None
+# Разделител между полетата в текста за търсене. Заявки, които го съдържат,
+# се отхвърлят, така че съвпадение не може да обхване две съседни полета
+SEARCH_BLOB_SEPARATOR = '\x00'
+
+# Размер на файла с данни, над който маршрутите се четат поточно с ijson
+STREAM_THRESHOLD_BYTES = 8 << 20
+
+# Допустими типове за географските координати
+_COORDINATE_TYPES = (int, float)
+
+# Време (в секунди), през което кешът се използва без проверка на файла
+CACHE_CHECK_TTL = 1.0
+
+# Максимален брой запомнени резултати за всяка функция за търсене
+QUERY_CACHE_SIZE = 256
+
+# Кеш за данните за подобряване на производителността - снимка (речник) със
+# списъка маршрути и индексите към него. Снимката се подменя изцяло при всяко
+# зареждане, така че списъкът и индексите винаги са от едно и също зареждане
+_data_snapshot = None
 _cache_timestamp = None
 
+# Номера на зарежданията - част от ключа на запомнените резултати
+_load_generations = itertools.count(1)
+
+# Монотонно време на последната проверка дали файлът е променян
+_cache_checked_at = 0.0
+
+# Време на последното зареждане на данните от файла
+_data_loaded_at = None
+
 # ============================================================================
 # ОСНОВНИ ФУНКЦИИ ЗА ТЪРСЕНЕ И ИЗВЛИЧАНЕ НА ДАННИ
 # ============================================================================
@@ -55,49 +101,22 @@ def search_trails(query: str) -> List[Dict[str, Any]]:
     if not normalized_query:
         return []
     
-    print(f"🔍 Търсене на маршрути за: '{query}'")
+    # Разделителят никога не се среща в полетата на маршрута
+    if SEARCH_BLOB_SEPARATOR in normalized_query:
+        return []
     
-    # Зареждане на данните от файла
-    trails_data = load_trail_data()
-    matching_trails = []
+    logger.debug("🔍 Търсене на маршрути за: '%s'", query)
     
-    for trail in trails_data:
-        # Пропускане на маршрути без валидни координати
-        if not _has_valid_coordinates(trail):
-            continue
-        
-        # Проверка в името на маршрута
-        trail_name = trail.get('name', '').lower()
-        if normalized_query in trail_name:
-            matching_trails.append(trail)
-            continue
-        
-        # Проверка в описанието
-        trail_description = trail.get('description', '').lower()
-        if normalized_query in trail_description:
-            matching_trails.append(trail)
-            continue
-        
-        # Проверка в региона
-        region = trail.get('location', {}).get('region', '').lower()
-        if normalized_query in region:
-            matching_trails.append(trail)
-            continue
-        
-        # Проверка в ключовите думи за местоположение
-        location_keywords = trail.get('location', {}).get('keywords', [])
-        if any(normalized_query in keyword.lower() for keyword in location_keywords):
-            matching_trails.append(trail)
-            continue
-        
-        # Проверка в детайлите за маршрута
-        trail_details = trail.get('trail_details', {})
-        difficulty = trail_details.get('difficulty', '').lower()
-        if normalized_query in difficulty:
-            matching_trails.append(trail)
-            continue
+    # Зареждане на данните от файла (презарежда ги ако файлът е променен)
+    snapshot = _current_snapshot()
+    
+    # Копие на запомнения резултат, за да не може да бъде променен отвън
+    matching_trails = (
+        list(_memoized(snapshot, _search_trails_cached, _search_snapshot, normalized_query))
+        if snapshot else []
+    )
     
-    print(f"✅ Намерени {len(matching_trails)} маршрута за '{query}'")
+    logger.debug("✅ Намерени %d маршрута за '%s'", len(matching_trails), query)
     return matching_trails
 
 
@@ -113,34 +132,74 @@ def get_trail_by_id(trail_id: str) -> Optional[Dict[str, Any]]:
     """
     # Валидация на входните данни
     if not trail_id or not isinstance(trail_id, str):
-        print("❌ Невалиден ID за маршрут")
+        logger.debug("❌ Невалиден ID за маршрут")
         return None
     
-    print(f"🔍 Търсене на маршрут с ID: {trail_id}")
+    logger.debug("🔍 Търсене на маршрут с ID: %s", trail_id)
     
-    # Зареждане на данните
-    trails_data = load_trail_data()
+    # Зареждане на данните (презарежда индекса ако файлът е променен)
+    snapshot = _current_snapshot()
     
-    # Търсене на маршрута с точно съвпадащ ID
-    for trail in trails_data:
-        if trail.get('id') == trail_id:
-            print(f"✅ Намерен маршрут: {trail.get('name', 'Неименован')}")
-            return trail
+    # Директно извличане от индекса по ID
+    trail = snapshot['id_index'].get(trail_id) if snapshot else None
+    if trail is not None:
+        logger.debug("✅ Намерен маршрут: %s", trail.get('name', 'Неименован'))
+        return trail
     
-    print(f"❌ Маршрут с ID '{trail_id}' не е намерен")
+    logger.debug("❌ Маршрут с ID '%s' не е намерен", trail_id)
     return None
 
 
-def list_all_trails() -> List[Dict[str, Any]]:
+def get_trails_by_ids(trail_ids: Sequence[str]) -> List[Optional[Dict[str, Any]]]:
+    """
+    Извлича няколко маршрута по техните идентификатори наведнъж.
+    
+    Предназначена за масови проверки (напр. при импорт) - данните се
+    зареждат и проверяват веднъж за цялата група вместо за всеки ID.
+    
+    Args:
+        trail_ids (Sequence[str]): Идентификаторите на маршрутите (списък,
+            кортеж или друга последователност)
+    
+    Returns:
+        List[Optional[Dict[str, Any]]]: Маршрутите в реда на идентификаторите,
+            с None за невалидните или ненамерените; празен списък ако
+            trail_ids не е последователност (напр. None) или е низ
+    """
+    if not isinstance(trail_ids, Sequence) or isinstance(trail_ids, (str, bytes)):
+        return []
+    
+    snapshot = _current_snapshot()
+    if not snapshot:
+        return [None] * len(trail_ids)
+    
+    id_index = snapshot['id_index']
+    found_trails = [
+        id_index.get(trail_id) if isinstance(trail_id, str) else None
+        for trail_id in trail_ids
+    ]
+    
+    logger.debug(
+        "✅ Намерени %d от %d маршрута по ID",
+        len(found_trails) - found_trails.count(None), len(trail_ids)
+    )
+    return found_trails
+
+
+def list_all_trails() -> Tuple[Dict[str, Any], ...]:
     """
     Връща всички налични екопътеки от базата данни.
     
+    Връща се неизменяем кортеж, създаден при зареждането на данните, така
+    че извикващият код не може да промени кеша без да се копират данните.
+    
     Returns:
-        List[Dict[str, Any]]: Пълен списък с всички екопътеки
+        Tuple[Dict[str, Any], ...]: Всички екопътеки
     """
-    trails_data = load_trail_data()
-    print(f"📋 Връщане на {len(trails_data)} общо маршрута")
-    return trails_data
+    snapshot = _current_snapshot()
+    all_trails = snapshot['trails_tuple'] if snapshot else ()
+    logger.debug("📋 Връщане на %d общо маршрута", len(all_trails))
+    return all_trails
 
 
 def advanced_search(
@@ -163,46 +222,32 @@ def advanced_search(
     Returns:
         List[Dict[str, Any]]: Списък от маршрути отговарящи на критериите
     """
-    print(f"🔍 Разширено търсене: регион='{region}', трудност='{difficulty}', сезон='{best_season}'")
+    logger.debug(
+        "🔍 Разширено търсене: регион='%s', трудност='%s', сезон='%s'",
+        region, difficulty, best_season
+    )
     
     # Зареждане на данните
-    trails_data = load_trail_data()
-    filtered_trails = []
+    snapshot = _current_snapshot()
     
-    # Нормализиране на параметрите за търсене
+    # Нормализиране на параметрите за търсене (празен критерий = без филтър)
     region_normalized = region.lower().strip() if region else None
     difficulty_normalized = difficulty.lower().strip() if difficulty else None
     season_normalized = best_season.strip() if best_season else None
     
-    for trail in filtered_trails:
-        # Флаг за проследяване дали маршрутът отговаря на всички критерии
-        matches_criteria = True
-        
-        # Филтриране по регион
-        if region_normalized:
-            trail_region = trail.get('location', {}).get('region', '').lower()
-            if region_normalized not in trail_region:
-                matches_criteria = False
-        
-        # Филтриране по трудност
-        if difficulty_normalized and matches_criteria:
-            trail_difficulty = trail.get('trail_details', {}).get('difficulty', '').lower()
-            if difficulty_normalized not in trail_difficulty:
-                matches_criteria = False
-        
-        # Филтриране по сезон
-        if season_normalized and matches_criteria:
-            trail_seasons = trail.get('best_season', [])
-            if not isinstance(trail_seasons, list):
-                matches_criteria = False
-            elif season_normalized not in trail_seasons:
-                matches_criteria = False
-        
-        # Добавяне на маршрута ако отговаря на всички критерии
-        if matches_criteria:
-            filtered_trails.append(trail)
+    if snapshot:
+        filtered_trails = list(_memoized(
+            snapshot,
+            _advanced_search_cached,
+            _filter_snapshot,
+            region_normalized or None,
+            difficulty_normalized or None,
+            season_normalized or None
+        ))
+    else:
+        filtered_trails = []
     
-    print(f"✅ Намерени {len(filtered_trails)} маршрута при разширеното търсене")
+    logger.debug("✅ Намерени %d маршрута при разширеното търсене", len(filtered_trails))
     return filtered_trails
 
 # ============================================================================
@@ -215,6 +260,14 @@ def load_trail_data() -> List[Dict[str, Any]]:
     
     Функцията чете данните от JSON файла, валидира ги и използва
     кеширане за подобряване на производителността при многократни заявки.
+    Големи файлове (над STREAM_THRESHOLD_BYTES) се четат поточно с ijson,
+    ако е наличен, за да не се държи целият документ в паметта.
+    Дали файлът е променян се проверява най-много веднъж на CACHE_CHECK_TTL
+    секунди.
+    
+    Връща се копие на кеширания списък - индексите към маршрутите са по
+    позиция в него, така че промяна на върнатия списък не трябва да достига
+    до кеша.
     
     Returns:
         List[Dict[str, Any]]: Списък с всички валидни екопътеки от файла
@@ -224,80 +277,300 @@ def load_trail_data() -> List[Dict[str, Any]]:
         json.JSONDecodeError: При невалиден JSON формат
         ValueError: При невалидна структура на данните
     """
-    global _data_cache, _cache_timestamp
+    snapshot = _load_snapshot()
+    return list(snapshot['trails']) if snapshot else []
+
+
+def _load_snapshot() -> Optional[Dict[str, Any]]:
+    """
+    Зарежда данните при нужда и връща снимката на кеша, без копиране.
+    
+    Returns:
+        Optional[Dict[str, Any]]: Снимката или None при грешка при зареждане
+    """
+    global _data_snapshot, _cache_timestamp, _data_loaded_at, _cache_checked_at
+    
+    # Кешът се връща директно ако файлът е проверен наскоро
+    now = time.monotonic()
+    snapshot = _data_snapshot
+    if snapshot is not None and now - _cache_checked_at < CACHE_CHECK_TTL:
+        return snapshot
     
     try:
         # Проверка дали файлът съществува
         if not os.path.exists(DATA_FILE_PATH):
-            print(f"❌ Файлът с данни не е намерен: {DATA_FILE_PATH}")
-            return []
+            logger.error("❌ Файлът с данни не е намерен: %s", DATA_FILE_PATH)
+            return None
         
         # Получаване на времето на последна промяна на файла
         file_modification_time = os.path.getmtime(DATA_FILE_PATH)
         
         # Използване на кеширани данни ако файлът не е променян
-        if _data_cache is not None and _cache_timestamp == file_modification_time:
-            return _data_cache
-        
-        print(f"📂 Зареждане на данни от: {DATA_FILE_PATH}")
+        if snapshot is not None and _cache_timestamp == file_modification_time:
+            _cache_checked_at = now
+            return snapshot
         
-        # Четене и парсване на JSON файла
-        with open(DATA_FILE_PATH, encoding='utf-8') as file:
-            raw_data = json.load(file)
+        logger.debug("📂 Зареждане на данни от: %s", DATA_FILE_PATH)
         
-        # Валидация на структурата на данните
-        if not isinstance(raw_data, dict):
-            raise ValueError("JSON файлът трябва да съдържа обект на най-високо ниво")
-        
-        eco_trails = raw_data.get('eco_trails')
-        if not isinstance(eco_trails, list):
-            raise ValueError("Полето 'eco_trails' трябва да бъде списък с маршрути")
+        if ijson is not None and os.path.getsize(DATA_FILE_PATH) >= STREAM_THRESHOLD_BYTES:
+            # Поточно четене - всеки маршрут се обработва веднага след парсването му
+            eco_trails = _stream_trails(DATA_FILE_PATH)
+        else:
+            # Четене и парсване на JSON файла
+            with open(DATA_FILE_PATH, 'rb') as file:
+                raw_data = _parse_json(file.read())
+            
+            # Валидация на структурата на данните
+            if not isinstance(raw_data, dict):
+                raise ValueError("JSON файлът трябва да съдържа обект на най-високо ниво")
+            
+            eco_trails = raw_data.get('eco_trails')
+            if not isinstance(eco_trails, list):
+                raise ValueError("Полето 'eco_trails' трябва да бъде списък с маршрути")
         
         # Валидация и почистване на отделните маршрути
         validated_trails = []
+        search_fields = []
+        total_count = 0
         for index, trail in enumerate(eco_trails):
+            total_count += 1
+            
             if not isinstance(trail, dict):
-                print(f"⚠️ Маршрут на позиция {index} не е валиден обект - пропускане")
+                logger.warning("⚠️ Маршрут на позиция %d не е валиден обект - пропускане", index)
                 continue
             
             # Проверка за задължителни полета
             trail_id = trail.get('id')
             if not trail_id:
-                print(f"⚠️ Маршрут на позиция {index} няма валиден ID - пропускане")
+                logger.warning("⚠️ Маршрут на позиция %d няма валиден ID - пропускане", index)
                 continue
             
             trail_name = trail.get('name')
             if not trail_name:
-                print(f"⚠️ Маршрут с ID {trail_id} няма име")
+                logger.warning("⚠️ Маршрут с ID %s няма име", trail_id)
             
             # Добавяне на допълнителни метаданни
-            trail['_loaded_at'] = datetime.now().isoformat()
             trail['_index'] = index
             
             validated_trails.append(trail)
+            search_fields.append(_prepare_search_fields(trail))
         
-        # Кеширане на валидираните данни
-        _data_cache = validated_trails
+        # Кеширане на валидираните данни и индексите към тях с една подмяна
+        snapshot = _build_snapshot(validated_trails, search_fields, next(_load_generations))
+        _data_snapshot = snapshot
         _cache_timestamp = file_modification_time
+        _data_loaded_at = datetime.now().isoformat()
+        _cache_checked_at = now
+        _clear_query_caches()
         
-        print(f"✅ Успешно заредени {len(validated_trails)} от {len(eco_trails)} маршрута")
-        return validated_trails
+        logger.info("✅ Успешно заредени %d от %d маршрута", len(validated_trails), total_count)
+        return snapshot
         
     except FileNotFoundError:
-        print(f"❌ Файлът с данни не е намерен: {DATA_FILE_PATH}")
-        return []
+        logger.error("❌ Файлът с данни не е намерен: %s", DATA_FILE_PATH)
+        return None
     
     except json.JSONDecodeError as e:
-        print(f"❌ Грешка при парсване на JSON файла: {str(e)}")
-        return []
+        logger.error("❌ Грешка при парсване на JSON файла: %s", e)
+        return None
     
     except ValueError as e:
-        print(f"❌ Грешка в структурата на данните: {str(e)}")
-        return []
+        logger.error("❌ Грешка в структурата на данните: %s", e)
+        return None
     
     except Exception as e:
-        print(f"❌ Неочаквана грешка при зареждане на данните: {str(e)}")
-        return []
+        logger.error("❌ Неочаквана грешка при зареждане на данните: %s", e)
+        return None
+
+
+def _parse_json(content: bytes) -> Any:
+    """
+    Парсва JSON съдържание, като използва orjson ако е наличен.
+    
+    Args:
+        content (bytes): Съдържанието на JSON файла в UTF-8
+    
+    Returns:
+        Any: Парснатите данни
+    
+    Raises:
+        json.JSONDecodeError: При невалиден JSON формат
+            (orjson.JSONDecodeError е негов наследник)
+    """
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _dump_json(data: Any) -> bytes:
+    """
+    Сериализира данни до JSON с отстъп от 2 интервала, като използва orjson
+    ако е наличен.
+    
+    Данни, които orjson не може да сериализира (напр. цели числа извън
+    64-битовия диапазон), се сериализират със стандартния json модул.
+    Форматът на някои числа с плаваща запетая се различава между двата пътя
+    (напр. 1e16 и 1e+16), а NaN и Infinity orjson записва като null.
+    
+    Args:
+        data (Any): Данните за сериализиране
+    
+    Returns:
+        bytes: JSON съдържанието в UTF-8 (без екраниране на не-ASCII символи)
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError as e:
+            logger.debug("orjson не може да сериализира данните (%s) - използва се json", e)
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def _stream_trails(path: str) -> Iterator[Any]:
+    """
+    Чете поточно маршрутите от списъка 'eco_trails' в JSON файла.
+    
+    Маршрутите се връщат един по един, без целият документ да се зарежда
+    в паметта. Структурата на документа се проверява преди първия маршрут
+    със същите грешки като при четене на целия файл.
+    
+    Args:
+        path (str): Път до JSON файла
+    
+    Yields:
+        Any: Поредният елемент от списъка 'eco_trails'
+    
+    Raises:
+        ValueError: При невалиден JSON формат или структура на данните
+    """
+    with open(path, 'rb') as file:
+        try:
+            _check_stream_structure(file)
+            file.seek(0)
+            
+            # use_float - числата се връщат като float вместо Decimal
+            yield from ijson.items(file, 'eco_trails.item', use_float=True)
+        except ijson.JSONError as e:
+            raise ValueError(f"Невалиден JSON при поточно четене: {e}") from e
+
+
+def _check_stream_structure(file) -> None:
+    """
+    Проверява поточно, че JSON документът е обект с поле 'eco_trails' списък.
+    
+    Събитията се четат само до началото на полето 'eco_trails', което
+    обикновено е в началото на файла.
+    
+    Args:
+        file: Отвореният в двоичен режим JSON файл
+    
+    Raises:
+        ValueError: При документ, който не е обект, или при липсващо поле
+            'eco_trails' или поле, което не е списък
+    """
+    events = ijson.parse(file)
+    
+    first_event = next(events, None)
+    if first_event is None or first_event[1] != 'start_map':
+        raise ValueError("JSON файлът трябва да съдържа обект на най-високо ниво")
+    
+    # Първото събитие с префикс 'eco_trails' е стойността на полето
+    for prefix, event, _ in events:
+        if prefix == 'eco_trails':
+            if event == 'start_array':
+                return
+            break
+    
+    raise ValueError("Полето 'eco_trails' трябва да бъде списък с маршрути")
+
+
+def _prepare_search_fields(trail: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Изчислява полетата за търсене на маршрута.
+    
+    Полетата се изчисляват веднъж при зареждане на данните, за да не се
+    повтаря преобразуването към малки букви на всяко поле при всяка заявка.
+    Пазят се в снимката на кеша отделно от самия маршрут, така че не попадат
+    в отговорите на API-то и в експортираните файлове.
+    
+    Стойности с неочакван тип се пропускат, за да не спре зареждането
+    на всички маршрути заради един непълен запис.
+    
+    Args:
+        trail (Dict[str, Any]): Данните за маршрута
+    
+    Returns:
+        Dict[str, Any]: Полетата за търсене:
+            - search_blob: името, описанието, регионът, ключовите думи и
+              трудността с малки букви, разделени със SEARCH_BLOB_SEPARATOR
+            - blob_mask: битовата маска на символите в search_blob
+            - region: регионът с малки букви
+            - difficulty: трудността с малки букви
+            - seasons: подходящите сезони (само текстовите стойности)
+            - has_valid_coords: дали маршрутът има валидни координати
+    """
+    location_info = _as_dict(trail.get('location'))
+    trail_details = _as_dict(trail.get('trail_details'))
+    
+    region = _as_text(location_info.get('region'))
+    difficulty = _as_text(trail_details.get('difficulty'))
+    
+    keywords = location_info.get('keywords', [])
+    if not isinstance(keywords, list):
+        keywords = []
+    
+    fields = [
+        _as_text(trail.get('name')),
+        _as_text(trail.get('description')),
+        region,
+        *(keyword for keyword in keywords if isinstance(keyword, str)),
+        difficulty
+    ]
+    search_blob = SEARCH_BLOB_SEPARATOR.join(fields).lower()
+    
+    # Сезоните се взимат предвид само ако са зададени като списък
+    seasons = trail.get('best_season', [])
+    if not isinstance(seasons, list):
+        seasons = []
+    
+    return {
+        'search_blob': search_blob,
+        'blob_mask': _char_mask(search_blob),
+        'region': region.lower(),
+        'difficulty': difficulty.lower(),
+        'seasons': tuple(season for season in seasons if isinstance(season, str)),
+        'has_valid_coords': _has_valid_coordinates(trail)
+    }
+
+
+def _as_dict(value: Any) -> Dict[str, Any]:
+    """Връща стойността ако е речник, иначе празен речник."""
+    return value if isinstance(value, dict) else {}
+
+
+def _as_text(value: Any) -> str:
+    """Връща стойността ако е низ, иначе празен низ."""
+    return value if isinstance(value, str) else ''
+
+
+def _char_mask(text: str) -> int:
+    """
+    Изчислява 64-битова маска на символите, които се срещат в текста.
+    
+    Всеки символ задава бит според последните 6 бита на кода си. Ако маската
+    на заявката не се съдържа в маската на даден текст, заявката със сигурност
+    не е подниз на текста и проверката за подниз може да бъде пропусната.
+    
+    Args:
+        text (str): Текстът за обработка
+    
+    Returns:
+        int: Битовата маска на символите
+    """
+    mask = 0
+    for char in set(text):
+        mask |= 1 << (ord(char) & 63)
+    return mask
 
 
 def _has_valid_coordinates(trail: Dict[str, Any]) -> bool:
@@ -326,20 +599,315 @@ def _has_valid_coordinates(trail: Dict[str, Any]) -> bool:
         latitude = coordinates.get('lat')
         longitude = coordinates.get('lng')
         
-        # Проверка дали координатите са числа
-        if not isinstance(latitude, (int, float)) or not isinstance(longitude, (int, float)):
-            return False
-        
-        # Проверка на валидните граници за координати
-        if not (-90 <= latitude <= 90) or not (-180 <= longitude <= 180):
-            return False
-        
-        return True
+        # Проверка дали координатите са числа и дали са във валидните граници.
+        # type() в кортеж е по-бързо от isinstance и изключва bool стойностите
+        return (
+            type(latitude) in _COORDINATE_TYPES
+            and type(longitude) in _COORDINATE_TYPES
+            and -90.0 <= latitude <= 90.0
+            and -180.0 <= longitude <= 180.0
+        )
         
     except (AttributeError, TypeError, KeyError):
         return False
 
 
+def _build_snapshot(
+    trails: List[Dict[str, Any]],
+    search_fields: List[Dict[str, Any]],
+    generation: int
+) -> Dict[str, Any]:
+    """
+    Създава снимката на кеша - заредените маршрути заедно с индексите към тях.
+    
+    Индексите по регион, трудност и сезон съпоставят нормализирана стойност
+    на списък от позициите на маршрутите с тази стойност, подредени както
+    в списъка с маршрути. Индексът по ID съпоставя идентификатора на самия
+    маршрут - при повтарящ се ID се запазва първият маршрут.
+    
+    Args:
+        trails (List[Dict[str, Any]]): Валидираните маршрути
+        search_fields (List[Dict[str, Any]]): Полетата за търсене на всеки
+            маршрут, на същата позиция като в trails
+        generation (int): Номерът на зареждането
+    
+    Returns:
+        Dict[str, Any]: Снимката с ключове 'generation', 'trails',
+            'trails_tuple', 'search_fields', 'region_index',
+            'difficulty_index', 'season_index' и 'id_index'
+    """
+    region_index = defaultdict(list)
+    difficulty_index = defaultdict(list)
+    season_index = defaultdict(list)
+    id_index = {}
+    
+    for position, (trail, fields) in enumerate(zip(trails, search_fields)):
+        # Търсенето по ID приема само низове, затова само те се индексират
+        if isinstance(trail['id'], str):
+            id_index.setdefault(trail['id'], trail)
+        
+        region_index[fields['region']].append(position)
+        difficulty_index[fields['difficulty']].append(position)
+        for season in fields['seasons']:
+            season_index[season].append(position)
+    
+    return {
+        'generation': generation,
+        'trails': trails,
+        'trails_tuple': tuple(trails),
+        'search_fields': search_fields,
+        'region_index': dict(region_index),
+        'difficulty_index': dict(difficulty_index),
+        'season_index': dict(season_index),
+        'id_index': id_index
+    }
+
+
+def _current_snapshot() -> Optional[Dict[str, Any]]:
+    """
+    Зарежда данните при нужда и връща текущата снимка на кеша.
+    
+    Функциите за търсене четат списъка и индексите само от върнатата снимка,
+    така че едно паралелно презареждане не може да смеси данни от две
+    различни зареждания.
+    
+    Returns:
+        Optional[Dict[str, Any]]: Снимката или None ако няма заредени маршрути
+    """
+    snapshot = _load_snapshot()
+    return snapshot if snapshot and snapshot['trails'] else None
+
+
+def _lookup_index(index: Dict[str, List[int]], value: str) -> Set[int]:
+    """
+    Намира позициите на маршрутите, чиято стойност съдържа търсения текст.
+    
+    Обхождат се само различните стойности в индекса, а не всички маршрути.
+    
+    Args:
+        index (Dict[str, List[int]]): Индекс стойност -> позиции
+        value (str): Нормализираният текст за търсене
+    
+    Returns:
+        Set[int]: Позициите на съвпадащите маршрути
+    """
+    positions = set()
+    for key, key_positions in index.items():
+        if value in key:
+            positions.update(key_positions)
+    return positions
+
+
+def _snapshot_for(generation: int) -> Optional[Dict[str, Any]]:
+    """
+    Връща текущата снимка на кеша, ако е от даденото зареждане.
+    
+    Args:
+        generation (int): Номерът на зареждането
+    
+    Returns:
+        Optional[Dict[str, Any]]: Снимката или None ако междувременно данните
+            са презаредени или изчистени
+    """
+    snapshot = _data_snapshot
+    if snapshot is not None and snapshot['generation'] == generation:
+        return snapshot
+    return None
+
+
+def _memoized(snapshot: Dict[str, Any], cached_function, search_function, *args) -> Tuple[Dict[str, Any], ...]:
+    """
+    Връща запомнения резултат за снимката или го изчислява директно от нея.
+    
+    Запомнените функции изчисляват резултат само от снимката със същия номер
+    на зареждане. Ако данните са презаредени междувременно, резултатът се
+    изчислява от подадената снимка без запомняне, така че отговорът никога
+    не смесва данни от две зареждания.
+    
+    Args:
+        snapshot (Dict[str, Any]): Снимката на кеша, с която работи заявката
+        cached_function: Запомнената функция (номер на зареждане, *args)
+        search_function: Търсенето в снимка (снимка, *args)
+        *args: Нормализираните параметри на търсенето
+    
+    Returns:
+        Tuple[Dict[str, Any], ...]: Маршрутите от подадената снимка
+    """
+    result = cached_function(snapshot['generation'], *args)
+    if result is None:
+        result = search_function(snapshot, *args)
+    return result
+
+
+@functools.lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _search_trails_cached(generation: int, normalized_query: str) -> Optional[Tuple[Dict[str, Any], ...]]:
+    """
+    Запомня резултата от _search_snapshot за снимката от дадено зареждане.
+    
+    Args:
+        generation (int): Номерът на зареждането от снимката на кеша
+        normalized_query (str): Заявката с малки букви и без крайни интервали
+    
+    Returns:
+        Optional[Tuple[Dict[str, Any], ...]]: Маршрутите отговарящи на заявката
+            или None ако текущата снимка не е от това зареждане
+    """
+    snapshot = _snapshot_for(generation)
+    return _search_snapshot(snapshot, normalized_query) if snapshot else None
+
+
+def _search_snapshot(snapshot: Dict[str, Any], normalized_query: str) -> Tuple[Dict[str, Any], ...]:
+    """
+    Търси нормализираната заявка в маршрутите от снимката на кеша.
+    
+    Args:
+        snapshot (Dict[str, Any]): Снимката на кеша
+        normalized_query (str): Заявката с малки букви и без крайни интервали
+    
+    Returns:
+        Tuple[Dict[str, Any], ...]: Маршрутите отговарящи на заявката
+    """
+    matching_trails = []
+    append = matching_trails.append
+    
+    # Битова маска на символите в заявката за бързо отхвърляне на маршрути
+    query_mask = _char_mask(normalized_query)
+    
+    for trail, fields in zip(snapshot['trails'], snapshot['search_fields']):
+        # Пропускане на маршрути без валидни координати
+        if not fields['has_valid_coords']:
+            continue
+        
+        # Текстът на маршрута не съдържа някой от символите на заявката
+        if fields['blob_mask'] & query_mask != query_mask:
+            continue
+        
+        # Едно търсене в предварително подготвения текст на маршрута
+        # (име, описание, регион, ключови думи и трудност)
+        if normalized_query in fields['search_blob']:
+            append(trail)
+    
+    return tuple(matching_trails)
+
+
+@functools.lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _advanced_search_cached(
+    generation: int,
+    region_normalized: Optional[str],
+    difficulty_normalized: Optional[str],
+    season_normalized: Optional[str]
+) -> Optional[Tuple[Dict[str, Any], ...]]:
+    """
+    Запомня резултата от _filter_snapshot за снимката от дадено зареждане.
+    
+    Args:
+        generation (int): Номерът на зареждането от снимката на кеша
+        region_normalized (Optional[str]): Регион с малки букви
+        difficulty_normalized (Optional[str]): Трудност с малки букви
+        season_normalized (Optional[str]): Сезон без крайни интервали
+    
+    Returns:
+        Optional[Tuple[Dict[str, Any], ...]]: Маршрутите отговарящи на
+            критериите или None ако текущата снимка не е от това зареждане
+    """
+    snapshot = _snapshot_for(generation)
+    if not snapshot:
+        return None
+    return _filter_snapshot(snapshot, region_normalized, difficulty_normalized, season_normalized)
+
+
+def _filter_snapshot(
+    snapshot: Dict[str, Any],
+    region_normalized: Optional[str],
+    difficulty_normalized: Optional[str],
+    season_normalized: Optional[str]
+) -> Tuple[Dict[str, Any], ...]:
+    """
+    Филтрира маршрутите от снимката на кеша по нормализираните критерии.
+    
+    Критерий със стойност None не се прилага.
+    
+    Args:
+        snapshot (Dict[str, Any]): Снимката на кеша
+        region_normalized (Optional[str]): Регион с малки букви
+        difficulty_normalized (Optional[str]): Трудност с малки букви
+        season_normalized (Optional[str]): Сезон без крайни интервали
+    
+    Returns:
+        Tuple[Dict[str, Any], ...]: Маршрутите отговарящи на критериите
+    """
+    trails_data = snapshot['trails']
+    
+    # Позициите на маршрутите, отговарящи на всеки активен критерий, се взимат
+    # от индексите - от най-селективния (точно съвпадение по сезон) към
+    # частичните съвпадения, като празен резултат прекратява търсенето
+    position_sets: List[Set[int]] = []
+    
+    if season_normalized:
+        position_sets.append(set(snapshot['season_index'].get(season_normalized, ())))
+    
+    if difficulty_normalized and all(position_sets):
+        position_sets.append(_lookup_index(snapshot['difficulty_index'], difficulty_normalized))
+    
+    if region_normalized and all(position_sets):
+        position_sets.append(_lookup_index(snapshot['region_index'], region_normalized))
+    
+    # Без активни филтри се връщат всички маршрути
+    if not position_sets:
+        return snapshot['trails_tuple']
+    
+    # Едно сечение на всички множества, започващо от най-малкото
+    position_sets.sort(key=len)
+    candidates = position_sets[0].intersection(*position_sets[1:])
+    
+    return tuple(trails_data[position] for position in sorted(candidates))
+
+
+@functools.lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _trails_by_region_cached(generation: int, region_normalized: str) -> Optional[Tuple[Dict[str, Any], ...]]:
+    """
+    Запомня резултата от _region_snapshot за снимката от дадено зареждане.
+    
+    Args:
+        generation (int): Номерът на зареждането от снимката на кеша
+        region_normalized (str): Регионът с малки букви и без крайни интервали
+    
+    Returns:
+        Optional[Tuple[Dict[str, Any], ...]]: Маршрутите от региона или None
+            ако текущата снимка не е от това зареждане
+    """
+    snapshot = _snapshot_for(generation)
+    return _region_snapshot(snapshot, region_normalized) if snapshot else None
+
+
+def _region_snapshot(snapshot: Dict[str, Any], region_normalized: str) -> Tuple[Dict[str, Any], ...]:
+    """
+    Намира маршрутите от даден регион в снимката на кеша.
+    
+    Args:
+        snapshot (Dict[str, Any]): Снимката на кеша
+        region_normalized (str): Регионът с малки букви и без крайни интервали
+    
+    Returns:
+        Tuple[Dict[str, Any], ...]: Маршрутите от региона
+    """
+    trails_data = snapshot['trails']
+    positions = _lookup_index(snapshot['region_index'], region_normalized)
+    return tuple(trails_data[position] for position in sorted(positions))
+
+
+def _clear_query_caches():
+    """
+    Изчиства запомнените резултати от търсенията.
+    
+    Извиква се при всяко презареждане или изчистване на данните, за да не
+    се връщат резултати от предишна версия на файла.
+    """
+    _search_trails_cached.cache_clear()
+    _advanced_search_cached.cache_clear()
+    _trails_by_region_cached.cache_clear()
+
+
 def clear_data_cache():
     """
     Изчиства кеша с данните за маршрутите.
@@ -347,10 +915,13 @@ def clear_data_cache():
     Полезна функция за принудително презареждане на данните от файла
     при следващата заявка. Използва се при актуализации на данните.
     """
-    global _data_cache, _cache_timestamp
-    _data_cache = None
+    global _data_snapshot, _cache_timestamp, _data_loaded_at, _cache_checked_at
+    _data_snapshot = None
     _cache_timestamp = None
-    print("🗑️ Кешът с данни за маршрутите е изчистен")
+    _data_loaded_at = None
+    _cache_checked_at = 0.0
+    _clear_query_caches()
+    logger.info("🗑️ Кешът с данни за маршрутите е изчистен")
 
 
 def get_data_statistics() -> Dict[str, Any]:
@@ -363,9 +934,9 @@ def get_data_statistics() -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: Статистическа информация за маршрутите
     """
-    trails_data = load_trail_data()
+    snapshot = _current_snapshot()
     
-    if not trails_data:
+    if not snapshot:
         return {
             'total_trails': 0,
             'regions': {},
@@ -374,35 +945,35 @@ def get_data_statistics() -> Dict[str, Any]:
             'last_updated': None
         }
     
-    # Инициализация на брояците
-    region_counts = {}
-    difficulty_counts = {}
-    season_counts = {}
+    trails_data = snapshot['trails']
     
-    for trail in trails_data:
-        # Броене по региони
-        region = trail.get('location', {}).get('region', 'Неизвестен регион')
-        region_counts[region] = region_counts.get(region, 0) + 1
-        
-        # Броене по трудност
-        difficulty = trail.get('trail_details', {}).get('difficulty', 'Неопределена трудност')
-        difficulty_counts[difficulty] = difficulty_counts.get(difficulty, 0) + 1
-        
-        # Броене по сезони
-        trail_seasons = trail.get('best_season', [])
-        if isinstance(trail_seasons, list):
-            for season in trail_seasons:
-                season_counts[season] = season_counts.get(season, 0) + 1
+    # Броене по региони и трудност (с оригиналното изписване на стойностите)
+    region_counts = Counter(
+        _as_dict(trail.get('location')).get('region', 'Неизвестен регион')
+        for trail in trails_data
+    )
+    difficulty_counts = Counter(
+        _as_dict(trail.get('trail_details')).get('difficulty', 'Неопределена трудност')
+        for trail in trails_data
+    )
+    
+    # Броене по сезони от предварително подготвените стойности
+    season_counts = Counter(
+        season
+        for fields in snapshot['search_fields']
+        for season in fields['seasons']
+    )
     
     return {
         'total_trails': len(trails_data),
-        'regions': region_counts,
-        'difficulties': difficulty_counts,
-        'seasons': season_counts,
+        'regions': dict(region_counts),
+        'difficulties': dict(difficulty_counts),
+        'seasons': dict(season_counts),
         'last_updated': datetime.now().isoformat(),
         'cache_info': {
-            'cached': _data_cache is not None,
-            'cache_timestamp': _cache_timestamp
+            'cached': _data_snapshot is not None,
+            'cache_timestamp': _cache_timestamp,
+            'loaded_at': _data_loaded_at
         }
     }
 
@@ -478,14 +1049,16 @@ def export_trails_to_json(output_path: str, trails: Optional[List[Dict[str, Any]
             }
         }
         
-        with open(output_path, 'w', encoding='utf-8') as file:
-            json.dump(export_data, file, ensure_ascii=False, indent=2)
+        # Сериализиране преди отваряне, за да не се изтрие съществуващ файл при грешка
+        content = _dump_json(export_data)
+        with open(output_path, 'wb') as file:
+            file.write(content)
         
-        print(f"✅ Данните са експортирани успешно в: {output_path}")
+        logger.info("✅ Данните са експортирани успешно в: %s", output_path)
         return True
         
     except Exception as e:
-        print(f"❌ Грешка при експорт: {str(e)}")
+        logger.error("❌ Грешка при експорт: %s", e)
         return False
 
 
@@ -502,15 +1075,14 @@ def get_trails_by_region(region: str) -> List[Dict[str, Any]]:
     if not region:
         return []
     
-    trails_data = load_trail_data()
-    region_trails = []
+    snapshot = _current_snapshot()
     
     region_normalized = region.lower().strip()
     
-    for trail in trails_data:
-        trail_region = trail.get('location', {}).get('region', '').lower()
-        if region_normalized in trail_region:
-            region_trails.append(trail)
+    region_trails = (
+        list(_memoized(snapshot, _trails_by_region_cached, _region_snapshot, region_normalized))
+        if snapshot else []
+    )
     
-    print(f"🏔️ Намерени {len(region_trails)} маршрута в регион '{region}'")
+    logger.debug("🏔️ Намерени %d маршрута в регион '%s'", len(region_trails), region)
     return region_trails
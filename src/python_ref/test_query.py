@@ -0,0 +1,190 @@
+"""
+Регресионни тестове за модула за търсене на екопътеки (query.py).
+
+Тестовете работят с малък JSON файл с маршрути във временна директория
+и проверяват резултатите от филтрите, търсенето по отделните полета и
+презареждането на данните след промяна на файла.
+"""
+
+import json
+import os
+
+import pytest
+
+import query
+
+
+# Маршрути за тестовете - всеки се различава по регион, трудност и сезони
+FIXTURE_TRAILS = [
+    {
+        'id': 'trail-a',
+        'name': 'Алфа пътека',
+        'description': 'Гориста пътека край реката',
+        'location': {
+            'region': 'Рила',
+            'keywords': ['Мальовица', 'езеро'],
+            'coordinates': {'lat': 42.2, 'lng': 23.4}
+        },
+        'trail_details': {'difficulty': 'Лесна'},
+        'best_season': ['Лято', 'Есен']
+    },
+    {
+        'id': 'trail-b',
+        'name': 'Бета маршрут',
+        'description': 'Стръмно изкачване до върха',
+        'location': {
+            'region': 'Пирин',
+            'keywords': ['Вихрен'],
+            'coordinates': {'lat': 41.7, 'lng': 23.4}
+        },
+        'trail_details': {'difficulty': 'Трудна'},
+        'best_season': ['Лято']
+    },
+    {
+        'id': 'trail-c',
+        'name': 'Гама екопътека',
+        'description': 'Зимен преход през гората',
+        'location': {
+            'region': 'Западна Рила',
+            'keywords': ['Боровец'],
+            'coordinates': {'lat': 42.3, 'lng': 23.6}
+        },
+        'trail_details': {'difficulty': 'Средна'},
+        'best_season': ['Зима']
+    },
+    {
+        'id': 'trail-d',
+        'name': 'Делта без координати',
+        'description': 'Маршрут край реката',
+        'location': {
+            'region': 'Рила',
+            'keywords': []
+        },
+        'trail_details': {'difficulty': 'Лесна'},
+        'best_season': ['Лято']
+    }
+]
+
+
+def _write_trails(path, trails):
+    """Записва маршрутите във файла с данни."""
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump({'eco_trails': trails}, file, ensure_ascii=False)
+
+
+def _ids(trails):
+    """Връща идентификаторите на маршрутите в реда им."""
+    return [trail['id'] for trail in trails]
+
+
+@pytest.fixture
+def data_file(tmp_path, monkeypatch):
+    """Насочва модула към временен файл с FIXTURE_TRAILS и чист кеш."""
+    path = tmp_path / 'eco.json'
+    _write_trails(path, FIXTURE_TRAILS)
+
+    monkeypatch.setattr(query, 'DATA_FILE_PATH', str(path))
+    monkeypatch.setattr(query, 'CACHE_CHECK_TTL', 0.0)
+    query.clear_data_cache()
+    yield path
+    query.clear_data_cache()
+
+
+# ============================================================================
+# РАЗШИРЕНО ТЪРСЕНЕ
+# ============================================================================
+
+def test_advanced_search_by_region(data_file):
+    assert _ids(query.advanced_search(region='рила')) == ['trail-a', 'trail-c', 'trail-d']
+
+
+def test_advanced_search_by_difficulty(data_file):
+    assert _ids(query.advanced_search(difficulty='ЛЕСНА')) == ['trail-a', 'trail-d']
+
+
+def test_advanced_search_by_season_is_exact(data_file):
+    assert _ids(query.advanced_search(best_season='Лято')) == ['trail-a', 'trail-b', 'trail-d']
+    assert query.advanced_search(best_season='лято') == []
+
+
+def test_advanced_search_combined_filters(data_file):
+    result = query.advanced_search(region='Рила', difficulty='лесна', best_season='Есен')
+    assert _ids(result) == ['trail-a']
+
+
+def test_advanced_search_without_filters_returns_all(data_file):
+    assert _ids(query.advanced_search()) == [trail['id'] for trail in FIXTURE_TRAILS]
+
+
+def test_advanced_search_no_match(data_file):
+    assert query.advanced_search(region='Пирин', best_season='Зима') == []
+
+
+# ============================================================================
+# ТЪРСЕНЕ ПО РЕГИОН
+# ============================================================================
+
+def test_get_trails_by_region_partial_and_case_insensitive(data_file):
+    assert _ids(query.get_trails_by_region(' РИЛА ')) == ['trail-a', 'trail-c', 'trail-d']
+    assert _ids(query.get_trails_by_region('пирин')) == ['trail-b']
+    assert query.get_trails_by_region('Родопи') == []
+
+
+# ============================================================================
+# ТЪРСЕНЕ ПО КЛЮЧОВА ДУМА
+# ============================================================================
+
+@pytest.mark.parametrize('search_query, expected', [
+    ('бета', ['trail-b']),            # име
+    ('изкачване', ['trail-b']),       # описание
+    ('западна', ['trail-c']),         # регион
+    ('мальовица', ['trail-a']),       # ключова дума
+    ('средна', ['trail-c']),          # трудност
+    ('реката', ['trail-a']),          # без маршрута без координати
+    ('пътека', ['trail-a', 'trail-c']),
+])
+def test_search_trails_across_fields(data_file, search_query, expected):
+    assert _ids(query.search_trails(search_query)) == expected
+
+
+def test_search_trails_does_not_match_across_field_boundaries(data_file):
+    # Краят на името и началото на описанието на trail-a
+    assert query.search_trails('пътека гориста') == []
+    assert query.search_trails('пътекагориста') == []
+
+
+def test_search_trails_invalid_queries(data_file):
+    assert query.search_trails('') == []
+    assert query.search_trails('   ') == []
+    assert query.search_trails(None) == []
+    assert query.search_trails('\x00') == []
+
+
+# ============================================================================
+# КЕШИРАНЕ И ПРЕЗАРЕЖДАНЕ
+# ============================================================================
+
+def test_reload_after_file_modification(data_file):
+    assert _ids(query.search_trails('бета')) == ['trail-b']
+    assert _ids(query.advanced_search(region='пирин')) == ['trail-b']
+
+    changed_trails = [dict(FIXTURE_TRAILS[1], id='trail-e', name='Епсилон маршрут')]
+    _write_trails(data_file, changed_trails)
+
+    # Гарантирано различно време на промяна независимо от точността на ФС
+    modification_time = os.path.getmtime(data_file) + 10
+    os.utime(data_file, (modification_time, modification_time))
+
+    assert query.search_trails('бета') == []
+    assert _ids(query.search_trails('епсилон')) == ['trail-e']
+    assert _ids(query.advanced_search(region='пирин')) == ['trail-e']
+    assert _ids(query.get_trails_by_region('пирин')) == ['trail-e']
+    assert query.get_trail_by_id('trail-b') is None
+
+
+def test_mutating_loaded_list_does_not_affect_searches(data_file):
+    query.load_trail_data().insert(0, {'id': 'extra', 'name': 'Бета копие'})
+
+    assert _ids(query.search_trails('бета')) == ['trail-b']
+    assert _ids(query.get_trails_by_region('пирин')) == ['trail-b']
+    assert _ids(query.advanced_search(best_season='Зима')) == ['trail-c']